@@ -1,49 +1,136 @@
 """Shared helpers for building the demo/game catalog from sheets, metadata and remote state."""
 from __future__ import annotations
 
+import argparse
+import hashlib
+import io
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
 
-import json
 import sys
 import urllib.parse
-import urllib.request
+
+import helper_json
+from helper_http import HTTPConnectionPool
 
 # Google Sheets utilities
-_REDIRECT_CODES = {301, 302, 303, 307, 308}
+# Shared between the concurrent sheet fetches so redirects and later sheets reuse open TLS connections
+_SHEET_POOL = HTTPConnectionPool()
 
 
-def fetch_sheet(url: str, *, timeout: Optional[float] = None) -> str:
-    """Return the sheet contents as text, following a single redirect if needed."""
-    request = urllib.request.Request(url)
-    with urllib.request.urlopen(request, timeout=timeout) as response:
-        if response.getcode() in _REDIRECT_CODES:
-            redirect_url = response.headers.get("Location")
-            if redirect_url:
-                with urllib.request.urlopen(redirect_url, timeout=timeout) as redirected:
-                    return redirected.read().decode("utf-8")
-        return response.read().decode("utf-8")
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "scummvm-sync"
+DEFAULT_SHEET_CACHE_TTL = 3600
 
 
-def parse_tsv(body: str) -> list[dict[str, str]]:
-    """Parse TSV text into a list of row dictionaries keyed by header."""
-    if not body:
-        return []
+@dataclass
+class SheetCache:
+    """On-disk cache of fetched sheet bodies, keyed by sheet URL."""
+
+    directory: Path = DEFAULT_CACHE_DIR
+    ttl: float = DEFAULT_SHEET_CACHE_TTL
+    refresh: bool = False
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.tsv"
+
+    def open(self, url: str) -> Optional[TextIO]:
+        """Return the cached body opened for reading if it is younger than the TTL."""
+        if self.refresh:
+            return None
+        path = self._path(url)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            return path.open(encoding="utf-8", newline="")
+        except FileNotFoundError:
+            return None
+
+    def tee(self, url: str, lines: Iterable[str]) -> Iterator[str]:
+        """Pass lines through while writing them to the cache; the entry is only stored once fully read."""
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        stored = False
+        try:
+            with temp_path.open("w", encoding="utf-8", newline="") as handle:
+                for line in lines:
+                    handle.write(line)
+                    yield line
+            temp_path.replace(path)
+            stored = True
+        finally:
+            if not stored:
+                temp_path.unlink(missing_ok=True)
+
+
+def add_sheet_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_SHEET_CACHE_TTL, help=f"Seconds to reuse cached Google Sheet data (default: {DEFAULT_SHEET_CACHE_TTL})")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch Google Sheets and don't cache them")
+    parser.add_argument("--refresh-cache", action="store_true", help="Fetch Google Sheets and update the cache")
+
+
+def sheet_cache_from_args(args: argparse.Namespace) -> Optional[SheetCache]:
+    if args.no_cache:
+        return None
+    return SheetCache(ttl=args.cache_ttl, refresh=args.refresh_cache)
+
+
+@contextmanager
+def open_sheet(url: str, *, timeout: Optional[float] = None, cache: Optional[SheetCache] = None) -> Iterator[Iterable[str]]:
+    """Yield the sheet as lines with their endings kept, streamed from the cache or the network."""
+    if cache is not None:
+        cached = cache.open(url)
+        if cached is not None:
+            with cached:
+                yield cached
+            return
+    with _SHEET_POOL.open(url, timeout=timeout) as response:
+        # newline="" keeps CRLF and bare newlines apart, parse_tsv_lines relies on the difference
+        text = io.TextIOWrapper(response, encoding="utf-8", newline="")
+        try:
+            yield text if cache is None else cache.tee(url, text)
+        finally:
+            # Leave closing the response to the pool so the connection can be reused
+            text.detach()
+
+
+def _iter_tsv_records(lines: Iterable[str]) -> Iterator[str]:
+    """Join lines into CRLF-terminated records; bare newlines inside cells stay part of the record."""
+    pending: List[str] = []
+    for line in lines:
+        if line.endswith("\r\n"):
+            pending.append(line[:-2])
+            yield "".join(pending)
+            pending.clear()
+        else:
+            pending.append(line)
+    if pending:
+        yield "".join(pending)
+
+
+def parse_tsv_lines(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """Yield row dictionaries keyed by header from TSV lines as they arrive."""
+    # Rows are CRLF separated while cells may contain bare newlines, which rules out the csv module here.
+    # zip() drops values without a header, like the previous index check, but without the Python-level loop.
+    records = _iter_tsv_records(lines)
+    header = next(records, None)
+    if header is None:
+        return
+    headers = header.split("\t")
+    for record in records:
+        if not record or record.isspace():
+            continue
+        yield dict(zip(headers, record.split("\t")))
 
-    lines = body.split("\r\n")
-    if not lines:
-        return []
 
-    headers = lines[0].split("\t")
-    rows: list[dict[str, str]] = []
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        values = line.split("\t")
-        row = {headers[i]: value for i, value in enumerate(values) if i < len(headers)}
-        rows.append(row)
-    return rows
+def parse_tsv(body: str) -> list[dict[str, str]]:
+    """Parse TSV text into a list of row dictionaries keyed by header."""
+    return list(parse_tsv_lines(io.StringIO(body, newline="")))
 
 
 # Game catalog constants and configuration
@@ -57,22 +144,27 @@ SHEET_IDS = {
 }
 
 ALLOWED_FIELDS = {"id", "relative_path", "description", "download_url", "languages", "platform"}
-LANGUAGE_COLUMNS = ["lang", "language", "language1", "language2", "language3"]
+LANGUAGE_COLUMNS = ("lang", "language", "language1", "language2", "language3")
 _SOURCE_PRIORITY = {"game_demos": 3, "director_demos": 2, "game_downloads": 1}
 
+DOWNLOADS_HOST = "downloads.scummvm.org"
+DOWNLOADS_BASE_URL = "https://" + DOWNLOADS_HOST
+# Only files under this prefix are mirrored by the sync scripts
+DOWNLOADS_FRS_PREFIX = DOWNLOADS_BASE_URL + "/frs/"
+
 
 def normalize_download_url(url: str) -> str:
     value = (url or "").strip()
     if not value:
         return value
     if value.startswith("/frs/"):
-        return f"https://downloads.scummvm.org{value}"
+        return DOWNLOADS_BASE_URL + value
     if value.startswith("frs/"):
-        return f"https://downloads.scummvm.org/{value}"
+        return DOWNLOADS_BASE_URL + "/" + value
     if value.startswith("//"):
-        return f"https:{value}"
-    if value.startswith("downloads.scummvm.org"):
-        return f"https://{value}"
+        return "https:" + value
+    if value.startswith(DOWNLOADS_HOST):
+        return "https://" + value
     return value
 
 
@@ -102,25 +194,29 @@ def _game_id_from_row(row: Dict[str, str]) -> Optional[str]:
 def compute_relative_path(url: str) -> str:
     if not url:
         return ""
-    filename = url.rsplit("/", maxsplit=1)[-1]
-    return filename[:-4] if filename.endswith(".zip") else ""
+    stem, _, extension = url.rpartition("/")[2].rpartition(".")
+    return stem if extension == "zip" else ""
 
 def extract_languages(row: Dict[str, str]) -> Optional[List[str]]:
     languages: List[str] = []
+    seen: Set[str] = set()
     for column in LANGUAGE_COLUMNS:
-        value = (row.get(column) or "").strip()
-        if value and value not in languages:
+        value = row.get(column)
+        if not value:
+            continue
+        value = value.strip()
+        if value and value not in seen:
+            seen.add(value)
             languages.append(value)
     return languages or None
 
 
 def load_metadata(metadata_path: Path) -> Dict[str, Dict[str, object]]:
-    if not metadata_path.exists():
+    try:
+        raw = helper_json.loads(metadata_path.read_bytes())
+    except FileNotFoundError:
         return {}
 
-    with open(metadata_path, "r", encoding="utf-8") as handle:
-        raw = json.load(handle)
-
     if not isinstance(raw, dict):
         raise ValueError("metadata.json must contain an object at the top level")
 
@@ -136,14 +232,22 @@ def load_metadata(metadata_path: Path) -> Dict[str, Dict[str, object]]:
     return metadata_by_path
 
 
-def fetch_sheet_rows(sheet_id: str) -> List[Dict[str, str]]:
+def fetch_sheet_rows(sheet_id: str, cache: Optional[SheetCache] = None) -> List[Dict[str, str]]:
     url = f"{SHEET_URL}&gid={sheet_id}"
-    body = fetch_sheet(url, timeout=30)  # 30 second timeout
-    return parse_tsv(body)
+    with open_sheet(url, timeout=30, cache=cache) as lines:  # 30 second timeout
+        return list(parse_tsv_lines(lines))
+
+
+def _submit_sheet_fetches(
+    executor: ThreadPoolExecutor, names: List[str], cache: Optional[SheetCache]
+) -> Dict[str, "Future[List[Dict[str, str]]]"]:
+    """Start fetching several sheets concurrently, returning their pending rows keyed by sheet name."""
+    return {name: executor.submit(fetch_sheet_rows, SHEET_IDS[name], cache) for name in names}
 
 
-def fetch_compatibility_ids() -> Set[str]:
-    rows = fetch_sheet_rows(SHEET_IDS["compatibility"])
+def fetch_compatibility_ids(rows: Optional[List[Dict[str, str]]] = None) -> Set[str]:
+    if rows is None:
+        rows = fetch_sheet_rows(SHEET_IDS["compatibility"])
     result: Set[str] = set()
     for row in rows:
         game_id = _game_id_from_row(row)
@@ -254,7 +358,8 @@ def add_rows_to_demo_map(
 def build_unified_demo_catalog(
     metadata_path: Path,
     compatibility_ids: Optional[Set[str]] = None,
-    platform_lookup: Optional[Dict[str, str]] = None
+    platform_lookup: Optional[Dict[str, str]] = None,
+    sheet_cache: Optional[SheetCache] = None,
 ) -> Dict[str, CombinedEntry]:
     """
     Build a unified catalog of all demos/games from sheets and metadata.
@@ -265,18 +370,28 @@ def build_unified_demo_catalog(
     Returns a dictionary mapping relative_path -> CombinedEntry with all the 
     computed flags for sync and inclusion decisions.
     """
+    # All sheets live on the same host and are independent, so fetch them in one batch
+    sheet_names = ["game_demos", "director_demos", "game_downloads"]
     if compatibility_ids is None:
-        compatibility_ids = fetch_compatibility_ids()
+        sheet_names.append("compatibility")
     if platform_lookup is None:
-        platform_lookup = fetch_platform_lookup()
-    
-    metadata_by_path = load_metadata(metadata_path)
+        sheet_names.append("platforms")
+    with ThreadPoolExecutor(max_workers=len(sheet_names)) as executor:
+        pending = _submit_sheet_fetches(executor, sheet_names, sheet_cache)
+        # Parse metadata.json while the sheet requests are in flight
+        metadata_by_path = load_metadata(metadata_path)
+        sheets = {name: future.result() for name, future in pending.items()}
+
+    if compatibility_ids is None:
+        compatibility_ids = fetch_compatibility_ids(sheets["compatibility"])
+    if platform_lookup is None:
+        platform_lookup = fetch_platform_lookup(sheets["platforms"])
     
     # Build initial map from sheet data
     demo_map: Dict[str, Dict[str, object]] = {}
     
     # Add game demos
-    demo_rows = fetch_sheet_rows(SHEET_IDS["game_demos"])
+    demo_rows = sheets["game_demos"]
     demos_added, demos_skipped, demos_kept_manually, demos_skipped_manually = add_rows_to_demo_map(demo_map, demo_rows, "game_demos", platform_lookup=platform_lookup, compatibility_ids=compatibility_ids, metadata_by_path=metadata_by_path)
     parts = [f"Found {demos_added} compatible game demos"]
     if demos_skipped > 0:
@@ -288,7 +403,7 @@ def build_unified_demo_catalog(
     print(f"{parts[0]} ({', '.join(parts[1:])})" if len(parts) > 1 else parts[0], file=sys.stderr)
     
     # Add director demos  
-    director_rows = fetch_sheet_rows(SHEET_IDS["director_demos"])
+    director_rows = sheets["director_demos"]
     director_added, director_skipped, director_kept_manually, director_skipped_manually = add_rows_to_demo_map(demo_map, director_rows, "director_demos", platform_lookup=platform_lookup, compatibility_ids=compatibility_ids, metadata_by_path=metadata_by_path)
     parts = [f"Found {director_added} compatible director demos"]
     if director_skipped > 0:
@@ -300,7 +415,7 @@ def build_unified_demo_catalog(
     print(f"{parts[0]} ({', '.join(parts[1:])})" if len(parts) > 1 else parts[0], file=sys.stderr)
     
     # Add game downloads
-    downloads_rows = fetch_sheet_rows(SHEET_IDS["game_downloads"])
+    downloads_rows = sheets["game_downloads"]
     downloads_added, downloads_skipped, downloads_kept_manually, downloads_skipped_manually = add_rows_to_demo_map(demo_map, downloads_rows, "game_downloads", platform_lookup=platform_lookup, compatibility_ids=compatibility_ids, metadata_by_path=metadata_by_path)
     parts = [f"Found {downloads_added} compatible game downloads"]
     if downloads_skipped > 0:
@@ -625,6 +740,13 @@ def create_json_entry(entry: CombinedEntry) -> Dict[str, object]:
     return filtered
 
 
+def write_games_json(entries: Iterable[Dict[str, object]], output_path: Path) -> int:
+    """Write games.json sorted case-insensitively by id, then relative path; returns the entry count."""
+    sorted_entries = sorted(entries, key=lambda item: (str(item.get("id", "")).lower(), str(item["relative_path"]).lower()))
+    output_path.write_bytes(helper_json.dumps_pretty(sorted_entries))
+    return len(sorted_entries)
+
+
 def validate_remote_folders(
     remote_folders: Set[str],
     demo_catalog: Dict[str, CombinedEntry]
@@ -660,8 +782,9 @@ def validate_remote_folders(
     return errors, warnings
 
 
-def fetch_platform_lookup() -> Dict[str, str]:
-    rows = fetch_sheet_rows(SHEET_IDS["platforms"])
+def fetch_platform_lookup(rows: Optional[List[Dict[str, str]]] = None) -> Dict[str, str]:
+    if rows is None:
+        rows = fetch_sheet_rows(SHEET_IDS["platforms"])
     lookup: Dict[str, str] = {}
     for row in rows:
         platform_id = (row.get("id") or "").strip()
@@ -0,0 +1,225 @@
+"""Helpers for issuing HTTP(S) requests over pooled keep-alive connections."""
+from __future__ import annotations
+
+import base64
+import http.client
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+_REDIRECT_CODES = {301, 302, 303, 307, 308}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# urlopen's default; some CDNs refuse requests that carry no User-Agent at all
+USER_AGENT = f"Python-urllib/{urllib.request.__version__}"
+
+_PoolKey = Tuple[str, str, int]
+
+
+class _Proxy(NamedTuple):
+    host: str
+    port: int
+    headers: Dict[str, str]
+
+
+def _proxy_for(scheme: str, host: str) -> Optional[_Proxy]:
+    """The proxy urlopen would use for this host, from http_proxy/https_proxy/no_proxy."""
+    proxy_url = urllib.request.getproxies().get(scheme)
+    if not proxy_url or urllib.request.proxy_bypass(host):
+        return None
+    if "://" not in proxy_url:
+        proxy_url = f"http://{proxy_url}"
+    parsed = urllib.parse.urlsplit(proxy_url)
+    if not parsed.hostname:
+        return None
+    headers: Dict[str, str] = {}
+    if parsed.username is not None:
+        credentials = f"{urllib.parse.unquote(parsed.username)}:{urllib.parse.unquote(parsed.password or '')}"
+        headers["Proxy-Authorization"] = "Basic " + base64.b64encode(credentials.encode()).decode("ascii")
+    return _Proxy(parsed.hostname, parsed.port or 8080, headers)
+
+
+class HTTPConnectionPool:
+    """Reuse keep-alive connections per host; safe to share between threads.
+
+    With max_per_host set, requests beyond that many in flight to one host wait for a free slot.
+    Proxies are taken from the environment like urlopen does: plain HTTP is forwarded through
+    the proxy and HTTPS is tunnelled with CONNECT.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_idle_per_host: int = 8,
+        max_redirects: int = 5,
+        max_per_host: Optional[int] = None,
+    ):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.max_redirects = max_redirects
+        self.max_per_host = max_per_host
+        # Highest number of simultaneous requests seen per host name
+        self.peak_in_flight: Dict[str, int] = {}
+        self._idle: Dict[_PoolKey, List[http.client.HTTPConnection]] = {}
+        self._slots: Dict[_PoolKey, threading.BoundedSemaphore] = {}
+        self._in_flight: Dict[_PoolKey, int] = {}
+        self._proxies: Dict[_PoolKey, Optional[_Proxy]] = {}
+        self._lock = threading.Lock()
+
+    def _enter_host(self, key: _PoolKey) -> None:
+        if self.max_per_host is not None:
+            with self._lock:
+                slot = self._slots.get(key)
+                if slot is None:
+                    slot = self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            slot.acquire()
+        with self._lock:
+            in_flight = self._in_flight.get(key, 0) + 1
+            self._in_flight[key] = in_flight
+            host = key[1]
+            if in_flight > self.peak_in_flight.get(host, 0):
+                self.peak_in_flight[host] = in_flight
+
+    def _leave_host(self, key: _PoolKey) -> None:
+        with self._lock:
+            self._in_flight[key] -= 1
+        if self.max_per_host is not None:
+            self._slots[key].release()
+
+    def _proxy(self, key: _PoolKey) -> Optional[_Proxy]:
+        with self._lock:
+            if key not in self._proxies:
+                self._proxies[key] = _proxy_for(key[0], key[1])
+            return self._proxies[key]
+
+    def _new_connection(self, key: _PoolKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        proxy = self._proxy(key)
+        if proxy is None:
+            return connection_class(host, port, timeout=self.timeout)
+        connection = connection_class(proxy.host, proxy.port, timeout=self.timeout)
+        if scheme == "https":
+            connection.set_tunnel(host, port, headers=proxy.headers)
+        return connection
+
+    def _acquire(self, key: _PoolKey) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return (connection, reused) for the given host."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(key), False
+
+    def _release(self, key: _PoolKey, connection: http.client.HTTPConnection, response: http.client.HTTPResponse) -> None:
+        try:
+            if not response.closed and response.length == 0:
+                # read1() callers such as TextIOWrapper stop at Content-Length without the EOF bookkeeping
+                response.read()
+            # Only fully consumed responses leave the connection ready for the next request;
+            # isclosed() is also true after an early close(), which leaves unread data on the socket
+            if response.isclosed() and not response.closed and not response.will_close:
+                with self._lock:
+                    idle = self._idle.setdefault(key, [])
+                    if len(idle) < self.max_idle_per_host:
+                        idle.append(connection)
+                        return
+            connection.close()
+        finally:
+            self._leave_host(key)
+
+    def _discard(self, key: _PoolKey, connection: http.client.HTTPConnection, response: http.client.HTTPResponse) -> None:
+        """Drain a response nobody reads and release it; the host slot is returned even if the read fails."""
+        try:
+            response.read()
+        except BaseException:
+            # A half-read body leaves the connection unusable, so make sure it isn't pooled
+            response.close()
+            raise
+        finally:
+            self._release(key, connection, response)
+
+    def _send(
+        self,
+        key: _PoolKey,
+        target: str,
+        headers: Mapping[str, str],
+        timeout: Optional[float],
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send the request; the host slot taken here is given back by _release."""
+        self._enter_host(key)
+        connection, reused = self._acquire(key)
+        while True:
+            if timeout is not None:
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+            try:
+                connection.request("GET", target, headers=dict(headers))
+                return connection, connection.getresponse()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if not reused:
+                    self._leave_host(key)
+                    raise
+                # The server dropped an idle keep-alive connection; retry once on a fresh one
+                connection, reused = self._new_connection(key), False
+
+    @contextmanager
+    def open(
+        self,
+        url: str,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[http.client.HTTPResponse]:
+        """GET the URL, following redirects, and yield the final response.
+
+        The connection goes back to the pool on exit if the body was read completely.
+        Raises urllib.error.HTTPError for error status codes, like urllib.request.urlopen.
+        """
+        request_headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        for _ in range(self.max_redirects + 1):
+            parsed = urllib.parse.urlsplit(url)
+            scheme = parsed.scheme.lower()
+            if scheme not in _DEFAULT_PORTS or not parsed.hostname:
+                raise ValueError(f"Unsupported URL: {url}")
+            key = (scheme, parsed.hostname, parsed.port or _DEFAULT_PORTS[scheme])
+            target = parsed.path or "/"
+            if parsed.query:
+                target = f"{target}?{parsed.query}"
+            send_headers = request_headers
+            proxy = self._proxy(key)
+            if proxy is not None and scheme == "http":
+                # Forwarding proxies take the absolute URL
+                target = urllib.parse.urlunsplit((scheme, parsed.netloc, target, "", ""))
+                send_headers = {**request_headers, **proxy.headers}
+
+            connection, response = self._send(key, target, send_headers, timeout)
+            if response.status in _REDIRECT_CODES and response.getheader("Location"):
+                location = response.getheader("Location")
+                self._discard(key, connection, response)
+                url = urllib.parse.urljoin(url, location)
+                continue
+            if response.status >= 400:
+                self._discard(key, connection, response)
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+
+            try:
+                yield response
+            finally:
+                self._release(key, connection, response)
+            return
+
+        raise urllib.error.URLError(f"Too many redirects for {url}")
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
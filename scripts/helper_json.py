@@ -0,0 +1,23 @@
+"""JSON helpers that use orjson when it is installed and fall back to the standard library."""
+from __future__ import annotations
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speedup, the scripts run fine without it
+    orjson = None
+
+
+def loads(data: bytes) -> object:
+    """Parse a JSON document from bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_pretty(value: object) -> bytes:
+    """Serialize with two-space indentation, keeping non-ASCII characters as UTF-8."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2)
+    return json.dumps(value, indent=2, ensure_ascii=False).encode("utf-8")
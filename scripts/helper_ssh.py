@@ -3,9 +3,30 @@ from __future__ import annotations
 
 import os
 import subprocess
-from typing import Dict, List, Optional, Tuple
+import sys
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
-CONTROL_PATH = "/tmp/scummvm-ssh-%r@%h:%p"
+# The pid keeps concurrent runs from sharing (and closing) each other's master
+CONTROL_PATH = f"/tmp/scummvm-ssh-{os.getpid()}-%r@%h:%p"
+# Long enough to outlive a full sync run, so the master is never re-established midway
+CONTROL_PERSIST = "1h"
+# Closing talks to the local master only; if it doesn't answer quickly it is wedged on a dead link
+CLOSE_TIMEOUT = 10
+
+
+def list_subdirectories_command(path: str) -> str:
+    """Remote shell command that prints the visible subdirectories of path, one per line.
+
+    Matches ls -1 plus test -d: dot-directories are skipped and symlinks to directories are
+    followed. Works with both GNU and BSD find.
+    """
+    return f'find -L "{path}" -mindepth 1 -maxdepth 1 -type d ! -name ".*"'
+
+
+def parse_subdirectories(output: str) -> Set[str]:
+    """Folder names from the output of list_subdirectories_command."""
+    return {line.rstrip("/").rsplit("/", 1)[-1] for line in output.splitlines() if line.strip()}
 
 
 class SSHHelper:
@@ -15,15 +36,18 @@ class SSHHelper:
         self.server = server
         self.port = port
 
-    def build_persistent_command(self, base_command: str = "ssh") -> Tuple[List[str], Dict[str, str]]:
-        """Return (command, environment) preconfigured for ControlMaster."""
+    def build_persistent_command(self, base_command: str = "ssh", control_master: str = "auto") -> Tuple[List[str], Optional[Dict[str, str]]]:
+        """Return (command, environment) preconfigured for ControlMaster.
+
+        The environment is None (inherit) unless sshpass needs the password in it.
+        """
         cmd: List[str] = []
-        env = os.environ.copy()
+        env: Optional[Dict[str, str]] = None
         ssh_password = os.environ.get("SSH_PASSWORD")
 
         if ssh_password:
             cmd.extend(["sshpass", "-e", base_command])
-            env["SSHPASS"] = ssh_password
+            env = {**os.environ, "SSHPASS": ssh_password}
         else:
             cmd.append(base_command)
 
@@ -41,11 +65,11 @@ class SSHHelper:
         cmd.extend(
             [
                 "-o",
-                "ControlMaster=auto",
+                f"ControlMaster={control_master}",
                 "-o",
                 f"ControlPath={CONTROL_PATH}",
                 "-o",
-                "ControlPersist=600",
+                f"ControlPersist={CONTROL_PERSIST}",
             ]
         )
 
@@ -57,22 +81,42 @@ class SSHHelper:
         return cmd, env
 
     def build_controlpath_command(self, base_command: str = "ssh") -> List[str]:
-        """Return a command that reuses the persistent connection."""
+        """Return a command that reuses the persistent connection.
+
+        If the master has gone away, ControlMaster=auto lets the command bring up a new one
+        (key-based auth only; BatchMode makes it fail fast instead of prompting for a password).
+        """
         cmd = [base_command]
+        ssh_key = os.environ.get("SSH_KEY_PATH")
+        if ssh_key and not os.environ.get("SSH_PASSWORD"):
+            cmd.extend(["-i", ssh_key])
         if self.port:
             port_value = str(self.port)
             if base_command == "scp":
                 cmd.extend(["-P", port_value])
             else:
                 cmd.extend(["-p", port_value])
-        cmd.extend(["-o", f"ControlPath={CONTROL_PATH}"])
+        cmd.extend(
+            [
+                "-o",
+                f"ControlPath={CONTROL_PATH}",
+                "-o",
+                "ControlMaster=auto",
+                "-o",
+                f"ControlPersist={CONTROL_PERSIST}",
+                "-o",
+                "BatchMode=yes",
+                "-o",
+                "StrictHostKeyChecking=no",
+            ]
+        )
         return cmd
 
     def open_persistent_connection(self) -> None:
         """Open the ControlMaster socket if a server is configured."""
         if not self.server:
             return
-        cmd, env = self.build_persistent_command()
+        cmd, env = self.build_persistent_command(control_master="yes")
         for index, argument in enumerate(cmd):
             if argument in {"ssh", "scp"}:
                 cmd.insert(index + 1, "-MNf")
@@ -80,16 +124,39 @@ class SSHHelper:
         cmd.append(self.server)
         subprocess.run(cmd, check=True, env=env)
 
+        # -f returns once authentication succeeded; make sure the socket is actually accepting clients
+        # build_controlpath_command also passes the port, which is part of the %p socket name
+        check_cmd = self.build_controlpath_command() + ["-O", "check", self.server]
+        result = subprocess.run(check_cmd, check=False, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"SSH control master is not running: {result.stderr.strip()}")
+
     def close_persistent_connection(self) -> Optional[subprocess.CompletedProcess]:
-        """Close the ControlMaster socket if it exists."""
+        """Close the ControlMaster socket if it exists.
+
+        Raises subprocess.TimeoutExpired if the master doesn't respond within CLOSE_TIMEOUT seconds.
+        """
         if not self.server:
             return None
-        cmd = [
-            "ssh",
-            "-O",
-            "exit",
-            "-o",
-            f"ControlPath={CONTROL_PATH}",
-            self.server,
-        ]
-        return subprocess.run(cmd, check=False, capture_output=True)
+        cmd = self.build_controlpath_command() + ["-O", "exit", self.server]
+        return subprocess.run(cmd, check=False, capture_output=True, text=True, timeout=CLOSE_TIMEOUT)
+
+    @contextmanager
+    def persistent_connection(self) -> Iterator[None]:
+        """Keep the ControlMaster socket open for the duration of the block."""
+        self.open_persistent_connection()
+        try:
+            yield
+        finally:
+            try:
+                result = self.close_persistent_connection()
+            except subprocess.TimeoutExpired:
+                # ControlPersist still expires the master on its own
+                print("Warning: Timed out closing SSH connection", file=sys.stderr)
+            else:
+                # 255 means the master was already gone, which is fine at this point
+                if result is not None and result.returncode not in (0, 255):
+                    print(
+                        f"Warning: Could not close SSH connection (exit code {result.returncode}): {result.stderr.strip()}",
+                        file=sys.stderr,
+                    )
@@ -2,7 +2,6 @@
 """Generate a minimal games.json based on remote content and metadata."""
 
 import argparse
-import json
 import os
 import subprocess
 import sys
@@ -10,36 +9,28 @@ from pathlib import Path
 from typing import Dict, List, Set
 
 from helper_gsheet import (
+    add_sheet_cache_arguments,
     build_unified_demo_catalog,
+    sheet_cache_from_args,
     validate_remote_folders,
     create_json_entry,
+    write_games_json,
 )
-from helper_ssh import SSHHelper
+from helper_ssh import SSHHelper, list_subdirectories_command, parse_subdirectories
 def list_remote_folders(ssh_helper: SSHHelper, server: str, base_path: str) -> Set[str]:
     """Return the set of direct subdirectories on the remote server."""
     if not server or not base_path:
         raise ValueError("Both server and base_path are required to list remote folders")
 
     base_cmd = ssh_helper.build_controlpath_command()
-    env = os.environ.copy()
-    base_cmd.extend([server, f'ls -1 "{base_path}"'])
+    base_cmd.extend([server, list_subdirectories_command(base_path)])
 
-    result = subprocess.run(base_cmd, capture_output=True, text=True, env=env, check=False)
+    result = subprocess.run(base_cmd, capture_output=True, text=True, check=False)
     if result.returncode != 0:
         stderr = result.stderr.strip()
         raise RuntimeError(f"Failed to list remote folders (exit {result.returncode}): {stderr}")
 
-    folders: Set[str] = set()
-    for line in result.stdout.splitlines():
-        entry = line.strip()
-        if not entry:
-            continue
-        test_cmd = ssh_helper.build_controlpath_command()
-        test_cmd.extend([server, f'test -d "{base_path}/{entry}"'])
-        test_result = subprocess.run(test_cmd, capture_output=True, env=env, check=False)
-        if test_result.returncode == 0:
-            folders.add(entry)
-    return folders
+    return parse_subdirectories(result.stdout)
 
 
 def main() -> int:
@@ -49,12 +40,13 @@ def main() -> int:
     parser.add_argument("--scp-server", help="SCP/SSH server in user@host format")
     parser.add_argument("--scp-path", help="Remote path containing demo folders")
     parser.add_argument("--scp-port", type=int, help="SSH/SCP port (default 22)")
+    add_sheet_cache_arguments(parser)
     args = parser.parse_args()
 
     metadata_path = Path(args.metadata)
     
     # Build unified demo catalog with all the logic centralized
-    demo_catalog = build_unified_demo_catalog(metadata_path)
+    demo_catalog = build_unified_demo_catalog(metadata_path, sheet_cache=sheet_cache_from_args(args))
 
     # Get remote server connection details
     scp_server = args.scp_server or (
@@ -69,11 +61,8 @@ def main() -> int:
 
     # List remote folders
     ssh_helper = SSHHelper(scp_server, scp_port)
-    ssh_helper.open_persistent_connection()
-    try:
+    with ssh_helper.persistent_connection():
         remote_folders = list_remote_folders(ssh_helper, scp_server, scp_path)
-    finally:
-        ssh_helper.close_persistent_connection()
 
     # Validate using improved logic
     errors, warnings = validate_remote_folders(remote_folders, demo_catalog)
@@ -107,13 +96,10 @@ def main() -> int:
         json_entry = create_json_entry(entry_data)
         entries.append(json_entry)
 
-    entries.sort(key=lambda item: (str(item.get("id", "")).lower(), item["relative_path"].lower()))
-
     output_path = Path(args.output)
-    with open(output_path, "w", encoding="utf-8") as handle:
-        json.dump(entries, handle, indent=2, ensure_ascii=False)
+    count = write_games_json(entries, output_path)
 
-    print(f"Wrote {len(entries)} entries to {output_path}")
+    print(f"Wrote {count} entries to {output_path}")
     
     # Return 1 if there were validation errors, 0 otherwise
     return 1 if has_errors else 0
@@ -2,81 +2,225 @@
 """ScummVM Game Downloader and Uploader."""
 
 import argparse
-import json
+import hashlib
+import http.client
+import io
+import multiprocessing
 import os
+import shlex
 import shutil
+import signal
+import stat
 import subprocess
 import sys
+import tarfile
+import threading
+import time
+import urllib.error
 import urllib.parse
-import urllib.request
 import zipfile
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set
 
 from helper_gsheet import (
+    DEFAULT_CACHE_DIR,
+    DOWNLOADS_BASE_URL,
+    DOWNLOADS_FRS_PREFIX,
     CombinedEntry,
+    SheetCache,
+    add_sheet_cache_arguments,
     build_unified_demo_catalog,
     compute_relative_path,
-    load_metadata,
     merge_entry,
     normalize_download_url,
+    sheet_cache_from_args,
     validate_remote_folders,
+    write_games_json,
 )
+import helper_json
+from helper_http import HTTPConnectionPool
+from helper_ssh import SSHHelper, list_subdirectories_command, parse_subdirectories
+
+# Downloads are network-bound, so a handful of threads keeps the link busy
+# while the main loop extracts and uploads earlier games.
+DOWNLOAD_WORKERS = 8
+# CDNs tend to answer 429 beyond about this many connections from one client
+DOWNLOAD_PER_HOST = 8
+# Throttling responses are retried with exponential backoff (1, 2, 4, 8 seconds or Retry-After)
+DOWNLOAD_RETRIES = 4
+RETRYABLE_STATUS_CODES = {429, 503}
+# Upper bound for a server-sent Retry-After, so one answer can't park a worker for an hour
+MAX_RETRY_DELAY = 60
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# A socket that stays silent this long is treated as dropped, so the download resumes on a new connection
+DOWNLOAD_TIMEOUT = 60
+# Archives up to this size are extracted from memory instead of being written to disk first
+IN_MEMORY_ZIP_LIMIT = 32 * 1024 * 1024
+# Uploads share the single ControlMaster connection, so a few sessions are enough to
+# overlap per-game latency; stays well below sshd's default MaxSessions of 10
+UPLOAD_WORKERS = 4
+# Engine test targets that never have downloads of their own
+EXCLUDED_GAME_IDS = frozenset({"testbed", "playground3d"})
+# How long build_http_index trusts the remote tree listing from an earlier run
+REMOTE_LISTING_TTL = 600
+
+
+class DownloadCancelled(Exception):
+    """Raised in a download worker once the run has been interrupted."""
+
+
+class DownloadTarget(NamedTuple):
+    """Where a catalog entry is downloaded from and the file name it gets locally."""
+
+    url: str
+    filename: str
+    is_zip: bool
+    is_scummvm_download: bool
+
+
+@dataclass
+class RemoteListing:
+    """Remote tree as seen by build_http_index: directories, folders with an index.json and file sizes."""
+
+    directories: Set[str] = field(default_factory=set)
+    index_dirs: Set[str] = field(default_factory=set)
+    files: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, entry_type: str, path: str, size: int) -> None:
+        """Add one find entry ("d" or "f"), ignoring hidden files and folders."""
+        if any(part.startswith(".") for part in path.split("/")):
+            return
+        if entry_type == "d":
+            self.directories.add(path)
+        elif entry_type == "f":
+            parent_dir, _, filename = path.rpartition("/")
+            if filename == "index.json":
+                self.index_dirs.add(parent_dir)
+            elif path:
+                self.files[path] = size
+
+    def update(self, other: "RemoteListing") -> None:
+        self.directories |= other.directories
+        self.index_dirs |= other.index_dirs
+        self.files.update(other.files)
+
+
+def _tree_factory() -> defaultdict:
+    return defaultdict(_tree_factory)
+
+
+def _extract_zip_worker(zip_path: Path, extract_dir: Path) -> bool:
+    """Extract and remove an archive; runs in a worker process.
+
+    Returns False if the target directory already existed and nothing was extracted.
+    """
+    if extract_dir.exists():
+        return False
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        zip_ref.extractall(extract_dir)
+    zip_path.unlink()
+    return True
+
+
+def _extract_zip_bytes_worker(data: bytes, extract_dir: Path) -> bool:
+    """Extract an archive held in memory; runs in a worker process like _extract_zip_worker."""
+    if extract_dir.exists():
+        return False
+    with zipfile.ZipFile(io.BytesIO(data), "r") as zip_ref:
+        zip_ref.extractall(extract_dir)
+    return True
+
 
 class GameDownloader:
-    def __init__(self, download_dir: str = "games", scp_server: Optional[str] = None, scp_path: Optional[str] = None, scp_port: Optional[int] = None):
+    def __init__(
+        self,
+        download_dir: str = "games",
+        scp_server: Optional[str] = None,
+        scp_path: Optional[str] = None,
+        scp_port: Optional[int] = None,
+        download_workers: int = DOWNLOAD_WORKERS,
+        per_host: int = DOWNLOAD_PER_HOST,
+    ):
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(exist_ok=True)
         self.scp_server = scp_server
         self.scp_path = scp_path
         self.scp_port = scp_port
+        self.ssh = SSHHelper(scp_server, scp_port)
+        self.download_workers = max(1, download_workers)
+        # Every download worker keeps its keep-alive connection to downloads.scummvm.org between games
+        self._http = HTTPConnectionPool(timeout=DOWNLOAD_TIMEOUT, max_idle_per_host=self.download_workers, max_per_host=max(1, per_host))
+        # Set on Ctrl-C so running downloads stop at the next chunk instead of keeping the process alive
+        self._cancel_downloads = threading.Event()
 
         self.catalog: Dict[str, CombinedEntry] = {}
-        self.metadata_by_path: Dict[str, Dict[str, object]] = {}
-        self.alias_map: Dict[str, str] = {}
+        # Lower-cased lookup keys for resolving requested games to catalog folders
+        self.paths_by_name: Dict[str, str] = {}
+        self.paths_by_game_id: Dict[str, str] = {}
+        self.paths_by_url: Dict[str, str] = {}
         self.merged_metadata_by_path: Dict[str, Dict[str, object]] = {}
-        self.processed_games_metadata: List[Dict[str, object]] = []
+        self.processed_games_metadata: Dict[str, Dict[str, object]] = {}
+        self._download_targets: Dict[str, DownloadTarget] = {}
+        self._print_lock = threading.Lock()
+        self._extract_executor: Optional[ProcessPoolExecutor] = None
+        self.remote_listing_cache: Optional[Path] = None
+        self.remote_listing_ttl = REMOTE_LISTING_TTL
+        self._uploaded_listings: List[RemoteListing] = []
+        self._listing_lock = threading.Lock()
+        # Whether rsync is installed on both ends; probed by the first upload
+        self._rsync_available: Optional[bool] = None
+        self._rsync_lock = threading.Lock()
+        self._terminal_width = self._detect_terminal_width()
+        if hasattr(signal, "SIGWINCH") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGWINCH, self._on_terminal_resize)
 
     # --- Catalog helpers -------------------------------------------------
 
-    def refresh_catalog(self, metadata_path: Path) -> None:
+    def refresh_catalog(self, metadata_path: Path, sheet_cache: Optional[SheetCache] = None) -> None:
         # Use the unified catalog builder which includes all debug output
-        self.catalog = build_unified_demo_catalog(metadata_path)
-        self.metadata_by_path = load_metadata(metadata_path)
+        self.catalog = build_unified_demo_catalog(metadata_path, sheet_cache=sheet_cache)
 
-        self.alias_map.clear()
+        self.paths_by_name.clear()
+        self.paths_by_game_id.clear()
+        self.paths_by_url.clear()
         self.merged_metadata_by_path.clear()
+        self._download_targets.clear()
         for relative_path, entry in self.catalog.items():
             merged_entry, notes = merge_entry(relative_path, entry.metadata, entry.demo_row)
             self.merged_metadata_by_path[relative_path] = merged_entry
             for note in notes:
                 print(f"Warning: {relative_path}: {note}", file=sys.stderr)
-            self._register_alias(relative_path, entry, merged_entry)
-
-    def _register_alias(self, relative_path: str, entry: CombinedEntry, merged_entry: Dict[str, object]) -> None:
-        def add_alias(value: Optional[str]) -> None:
-            if not value:
-                return
-            self.alias_map.setdefault(value.lower(), relative_path)
+            self._index_entry(relative_path, entry, merged_entry)
 
-        add_alias(relative_path)
-        add_alias(relative_path.lower())
+    def _index_entry(self, relative_path: str, entry: CombinedEntry, merged_entry: Dict[str, object]) -> None:
+        self.paths_by_name.setdefault(relative_path.lower(), relative_path)
         if entry.game_id:
-            add_alias(entry.game_id)
-            short_id = entry.game_id.split(":")[-1]
-            add_alias(short_id)
-        if entry.sheet_download_url:
-            add_alias(entry.sheet_download_url)
-        if entry.sheet_download_url_relative:
-            add_alias(entry.sheet_download_url_relative)
+            game_id = entry.game_id.lower()
+            self.paths_by_game_id.setdefault(game_id, relative_path)
+            self.paths_by_game_id.setdefault(game_id.rpartition(":")[2], relative_path)
+
+        # Download URLs resolve through their file name at lookup time; only keep the ones naming a different folder
         metadata_download = str((entry.metadata or {}).get("download_url") or "").strip()
-        if metadata_download:
-            add_alias(metadata_download)
-            add_alias(normalize_download_url(metadata_download))
         merged_download = str(merged_entry.get("download_url") or "").strip()
-        if merged_download:
-            add_alias(merged_download)
-            add_alias(normalize_download_url(merged_download))
+        for url in (entry.sheet_download_url, entry.sheet_download_url_relative, metadata_download, merged_download):
+            if url and compute_relative_path(url) != relative_path:
+                self.paths_by_url.setdefault(normalize_download_url(url).lower(), relative_path)
+
+    def _lookup_path(self, candidate: str) -> Optional[str]:
+        key = candidate.lower()
+        resolved = self.paths_by_name.get(key) or self.paths_by_game_id.get(key)
+        if resolved:
+            return resolved
+        rel_candidate = compute_relative_path(candidate)
+        if rel_candidate:
+            resolved = self.paths_by_name.get(rel_candidate.lower())
+            if resolved:
+                return resolved
+        return self.paths_by_url.get(normalize_download_url(candidate).lower())
 
     def resolve_requested_targets(self, requested: Sequence[str]) -> List[str]:
         if not requested:
@@ -84,35 +228,20 @@ class GameDownloader:
             syncable = [path for path, entry in self.catalog.items() if entry.should_sync]
             return sorted(syncable)
 
-        resolved: List[str] = []
+        # A dict keeps the first-requested order while deduplicating in O(1) per token
+        resolved: Dict[str, None] = {}
         for token in requested:
             candidate = (token or "").strip()
             if not candidate:
                 continue
 
-            lookup_keys = [candidate.lower()]
-            rel_candidate = compute_relative_path(candidate)
-            if rel_candidate:
-                lookup_keys.append(rel_candidate.lower())
-
-            if candidate.startswith("http"):
-                parsed_relative = compute_relative_path(candidate)
-                if parsed_relative:
-                    lookup_keys.append(parsed_relative.lower())
-
-            resolved_relative: Optional[str] = None
-            for key in lookup_keys:
-                resolved_relative = self.alias_map.get(key)
-                if resolved_relative:
-                    break
-
+            resolved_relative = self._lookup_path(candidate)
             if not resolved_relative:
                 raise ValueError(f"Unknown game identifier: {token}")
 
-            if resolved_relative not in resolved:
-                resolved.append(resolved_relative)
+            resolved.setdefault(resolved_relative)
 
-        return resolved
+        return list(resolved)
 
     def _select_download_url(self, entry: CombinedEntry) -> Optional[str]:
         candidate = entry.sheet_download_url
@@ -123,179 +252,283 @@ class GameDownloader:
         if candidate.startswith("http://") or candidate.startswith("https://"):
             return candidate
         if candidate.startswith("/"):
-            return f"https://downloads.scummvm.org{candidate}"
+            return DOWNLOADS_BASE_URL + candidate
         return candidate
 
+    def _download_target(self, relative_path: str, entry: CombinedEntry) -> DownloadTarget:
+        """Resolve the download URL and local file name once per catalog entry."""
+        target = self._download_targets.get(relative_path)
+        if target is None:
+            url = self._select_download_url(entry) or ""
+            filename = url.rpartition("/")[2] if url else relative_path
+            target = DownloadTarget(url, filename, filename.endswith(".zip"), url.startswith(DOWNLOADS_FRS_PREFIX))
+            self._download_targets[relative_path] = target
+        return target
+
     # --- Output helpers --------------------------------------------------
 
     def generate_processed_games_json(self) -> None:
-        output_file = Path.cwd() / "games.json"
-        sorted_games = sorted(self.processed_games_metadata, key=lambda item: (str(item.get("id", "")).lower(), item["relative_path"].lower()))
-        with open(output_file, "w", encoding="utf-8") as handle:
-            json.dump(sorted_games, handle, indent=2, ensure_ascii=False)
-        self._print(f"Generated games.json with {len(sorted_games)} processed games")
+        count = write_games_json(self.processed_games_metadata.values(), Path.cwd() / "games.json")
+        self._print(f"Generated games.json with {count} processed games")
 
     # --- Logging helpers -------------------------------------------------
 
-    def _temp_print(self, message: str, file=sys.stderr) -> None:
-        try:
-            terminal_width = os.get_terminal_size().columns
-        except OSError:
-            terminal_width = 80
-        padded_message = message.ljust(terminal_width)
-        print(padded_message, end="\r", flush=True, file=file)
-
-    def _print(self, message: str, file=sys.stderr) -> None:
+    @staticmethod
+    def _detect_terminal_width() -> int:
         try:
-            terminal_width = os.get_terminal_size().columns
+            return os.get_terminal_size().columns
         except OSError:
-            terminal_width = 80
-        padded_message = message.ljust(terminal_width)
-        print(padded_message, file=file)
-
-    # --- SSH helpers -----------------------------------------------------
-
-    def _build_ssh_command(self, base_command: str = "ssh"):
-        cmd: List[str] = []
-        env = os.environ.copy()
-        control_path = "/tmp/scummvm-ssh-%r@%h:%p"
-
-        ssh_password = os.environ.get("SSH_PASSWORD")
-        if ssh_password:
-            cmd.extend(["sshpass", "-e", base_command])
-            env["SSHPASS"] = ssh_password
-        else:
-            cmd.append(base_command)
-
-        ssh_key = os.environ.get("SSH_KEY_PATH")
-        if ssh_key and not ssh_password:
-            cmd.extend(["-i", ssh_key])
+            return 80
 
-        if self.scp_port:
-            if base_command == "scp":
-                cmd.extend(["-P", str(self.scp_port)])
-            else:
-                cmd.extend(["-p", str(self.scp_port)])
+    def _on_terminal_resize(self, signum, frame) -> None:
+        self._terminal_width = self._detect_terminal_width()
 
-        cmd.extend(["-o", "ControlMaster=auto", "-o", f"ControlPath={control_path}", "-o", "ControlPersist=600"])
+    def _temp_print(self, message: str, file=sys.stderr) -> None:
+        padded_message = message.ljust(self._terminal_width)
+        with self._print_lock:
+            print(padded_message, end="\r", flush=True, file=file)
 
-        if ssh_password:
-            cmd.extend(["-o", "StrictHostKeyChecking=no"])
-        else:
-            cmd.extend(["-o", "BatchMode=yes", "-o", "StrictHostKeyChecking=no"])
+    def _print(self, message: str, file=sys.stderr) -> None:
+        padded_message = message.ljust(self._terminal_width)
+        with self._print_lock:
+            print(padded_message, file=file)
 
-        return cmd, env
+    # --- SSH helpers -----------------------------------------------------
 
     def _build_controlpath_ssh_command(self, base_command: str = "ssh") -> List[str]:
-        cmd = [base_command]
-        control_path = "/tmp/scummvm-ssh-%r@%h:%p"
-
-        if self.scp_port:
-            if base_command == "scp":
-                cmd.extend(["-P", str(self.scp_port)])
-            else:
-                cmd.extend(["-p", str(self.scp_port)])
-
-        cmd.extend(["-o", f"ControlPath={control_path}"])
-        return cmd
+        return self.ssh.build_controlpath_command(base_command)
 
     def open_connection(self) -> None:
-        ssh_cmd, env = self._build_ssh_command()
-        ssh_pos = next((i for i, arg in enumerate(ssh_cmd) if arg in {"ssh", "scp"}), 0)
-        ssh_cmd.insert(ssh_pos + 1, "-MNf")
-        ssh_cmd.append(f"{self.scp_server}")
-        subprocess.run(ssh_cmd, check=True, env=env)
+        self.ssh.open_persistent_connection()
         self._temp_print("Opened SSH connection")
 
     def close_connection(self) -> None:
-        control_path = "/tmp/scummvm-ssh-%r@%h:%p"
-        close_cmd = ["ssh", "-O", "exit", "-o", f"ControlPath={control_path}", f"{self.scp_server}"]
-        result = subprocess.run(close_cmd, check=False, capture_output=True)
+        try:
+            result = self.ssh.close_persistent_connection()
+        except subprocess.TimeoutExpired:
+            # ControlPersist still expires the master on its own
+            self._print("Warning: Timed out closing SSH connection")
+            return
+        if result is None:
+            return
         if result.returncode == 0:
             self._temp_print("Closed SSH connection")
         elif result.returncode == 255:
             self._temp_print("SSH connection already closed")
         else:
-            stderr_output = result.stderr.decode("utf-8", errors="ignore").strip()
+            stderr_output = result.stderr.strip()
             self._print(f"Warning: Could not close SSH connection (exit code {result.returncode}): {stderr_output}")
 
+    @contextmanager
+    def ssh_session(self) -> Iterator[None]:
+        """Keep one ControlMaster connection open so every ssh/scp call in the block reuses it."""
+        if not self.scp_server or not self.scp_path:
+            yield
+            return
+        self.open_connection()
+        try:
+            yield
+        finally:
+            self.close_connection()
+
     def get_remote_folders(self) -> Set[str]:
         if not self.scp_server or not self.scp_path:
             return set()
 
+        # List only directories in a single remote command instead of probing each entry
         ssh_cmd = self._build_controlpath_ssh_command()
-        env = os.environ.copy()
-        ssh_cmd.extend([self.scp_server, f'ls -1 "{self.scp_path}"'])
+        ssh_cmd.extend([self.scp_server, list_subdirectories_command(self.scp_path)])
 
-        result = subprocess.run(ssh_cmd, capture_output=True, check=False, env=env, timeout=30, text=True)
+        result = subprocess.run(ssh_cmd, capture_output=True, check=False, timeout=60, text=True)
         if result.returncode != 0:
             raise RuntimeError(f"Remote command failed: {result.stderr.strip()}")
 
-        folders: Set[str] = set()
-        for line in result.stdout.strip().splitlines():
-            entry = line.strip()
-            if not entry:
-                continue
-            test_cmd = self._build_controlpath_ssh_command()
-            test_cmd.extend([self.scp_server, f'test -d "{self.scp_path}/{entry}"'])
-            test_result = subprocess.run(test_cmd, capture_output=True, check=False, env=env, timeout=10)
-            if test_result.returncode == 0:
-                folders.add(entry)
-        return folders
-
-    def folder_exists_on_remote(self, folder_name: str, remote_folders_set: Optional[Set[str]] = None) -> bool:
+        return parse_subdirectories(result.stdout)
+
+    def folder_exists_on_remote(self, folder_name: str, remote_folders_set: Set[str]) -> bool:
+        """Check a folder against the listing fetched once by download_and_process_games."""
         if not self.scp_server or not self.scp_path:
             return False
 
-        if remote_folders_set is not None:
-            if folder_name in remote_folders_set:
-                remote_folders_set.remove(folder_name)
-                return True
-            return False
+        return folder_name in remote_folders_set
 
+    def get_existing_remote_folders(self, folder_names: Sequence[str]) -> Set[str]:
+        """Return which of the given folders exist on the remote, using a single remote command."""
+        if not self.scp_server or not self.scp_path or not folder_names:
+            return set()
+
+        quoted_names = " ".join(shlex.quote(name) for name in folder_names)
+        remote_command = f'cd "{self.scp_path}" && for d in {quoted_names}; do if [ -d "$d" ]; then echo "$d"; fi; done'
         ssh_cmd = self._build_controlpath_ssh_command()
-        env = os.environ.copy()
-        ssh_cmd.extend([self.scp_server, f'test -d "{self.scp_path}/{folder_name}"'])
+        ssh_cmd.extend([self.scp_server, remote_command])
 
-        result = subprocess.run(ssh_cmd, capture_output=True, check=False, env=env, timeout=30)
-        if result.returncode in (0, 1):
-            return result.returncode == 0
+        result = subprocess.run(ssh_cmd, capture_output=True, check=False, timeout=60, text=True)
+        if result.returncode == 0:
+            return {line for line in result.stdout.splitlines() if line}
 
-        stderr_output = result.stderr.decode("utf-8", errors="ignore").strip()
+        stderr_output = result.stderr.strip()
         if result.returncode == 255:
             raise RuntimeError(f"Failed to connect to remote server: {stderr_output}")
         raise RuntimeError(f"Remote command failed: {stderr_output}")
 
     # --- File transfer helpers ------------------------------------------
 
-    def download_file(self, url: str, filename: str) -> Path:
-        filepath = self.download_dir / filename
-        temp_filepath = self.download_dir / f"{filename}.downloading"
-
+    @staticmethod
+    def _encode_url(url: str) -> str:
         parsed_url = urllib.parse.urlparse(url)
         encoded_path = urllib.parse.quote(parsed_url.path, safe="/")
-        encoded_url = urllib.parse.urlunparse((parsed_url.scheme, parsed_url.netloc, encoded_path, parsed_url.params, parsed_url.query, parsed_url.fragment))
+        return urllib.parse.urlunparse((parsed_url.scheme, parsed_url.netloc, encoded_path, parsed_url.params, parsed_url.query, parsed_url.fragment))
 
+    @contextmanager
+    def _open_download(self, url: str, headers: Optional[Dict[str, str]] = None) -> Iterator[http.client.HTTPResponse]:
+        """Open a download on a pooled connection, backing off while the server answers 429/503."""
+        encoded_url = self._encode_url(url)
         self._temp_print(f"Downloading {encoded_url}")
-        urllib.request.urlretrieve(encoded_url, temp_filepath)
+        with ExitStack() as stack:
+            attempt = 0
+            while True:
+                try:
+                    response = stack.enter_context(self._http.open(encoded_url, headers=headers))
+                    break
+                except urllib.error.HTTPError as exc:
+                    if exc.code not in RETRYABLE_STATUS_CODES or attempt >= DOWNLOAD_RETRIES:
+                        raise
+                    delay = 2 ** attempt
+                    retry_after = exc.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        delay = min(max(delay, int(retry_after)), MAX_RETRY_DELAY)
+                    self._temp_print(f"Server busy ({exc.code}), retrying {encoded_url} in {delay}s")
+                    if self._cancel_downloads.wait(delay):
+                        raise DownloadCancelled(f"Download of {encoded_url} interrupted")
+                    attempt += 1
+            yield response
+
+    def _resume_headers(self, filename: str) -> Dict[str, str]:
+        """Range/If-Range headers that continue a .downloading file left by an interrupted attempt."""
+        temp_filepath = self.download_dir / f"{filename}.downloading"
+        validator_path = self.download_dir / f"{filename}.downloading.validator"
+        try:
+            offset = temp_filepath.stat().st_size
+            validator = validator_path.read_text().strip()
+        except FileNotFoundError:
+            return {}
+        if not offset or not validator:
+            return {}
+        # If-Range makes the server send the whole file again if it changed since the partial was written
+        return {"Range": f"bytes={offset}-", "If-Range": validator}
+
+    def _save_response(self, response, filename: str) -> Path:
+        filepath = self.download_dir / filename
+        temp_filepath = self.download_dir / f"{filename}.downloading"
+        validator_path = self.download_dir / f"{filename}.downloading.validator"
+        mode = "wb"
+        if response.status == 206:
+            content_range = response.headers.get("Content-Range", "")
+            start = content_range[len("bytes "):].partition("-")[0]
+            if not content_range.startswith("bytes ") or not start.isdigit() or int(start) != temp_filepath.stat().st_size:
+                self._cleanup_local(temp_filepath, validator_path)
+                raise http.client.HTTPException(f"Unexpected Content-Range {content_range!r} for {filename}")
+            mode = "ab"
+            self._temp_print(f"Resuming {filename} at byte {start}")
+        else:
+            # Only strong ETags are valid in If-Range; otherwise fall back to Last-Modified
+            etag = response.headers.get("ETag", "")
+            validator = etag if etag and not etag.startswith("W/") else response.headers.get("Last-Modified", "")
+            if validator:
+                validator_path.write_text(validator)
+            else:
+                self._cleanup_local(validator_path)
+        with open(temp_filepath, mode) as handle:
+            while True:
+                if self._cancel_downloads.is_set():
+                    # The partial .downloading file stays on disk for the next run
+                    raise DownloadCancelled(f"Download of {filename} interrupted")
+                chunk = response.read(DOWNLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                handle.write(chunk)
+        if response.length:
+            # read(amt) returns short instead of raising when the server closes the connection early
+            raise http.client.IncompleteRead(b"", response.length)
         temp_filepath.rename(filepath)
+        self._cleanup_local(validator_path)
         self._temp_print(f"Download completed: {filename}")
         return filepath
 
     def extract_zip(self, zip_path: Path) -> Path:
         zip_path = Path(zip_path)
         extract_dir = self.download_dir / zip_path.stem
-        if extract_dir.exists():
+        self._temp_print(f"Extracting {zip_path} to {extract_dir}")
+        # Decompression is CPU-bound, so run it in the process pool when one is active
+        if self._extract_executor is not None:
+            extracted = self._extract_executor.submit(_extract_zip_worker, zip_path, extract_dir).result()
+        else:
+            extracted = _extract_zip_worker(zip_path, extract_dir)
+        if not extracted:
             self._print(f"Directory {extract_dir} already exists, skipping extraction")
             return extract_dir
-
-        self._temp_print(f"Extracting {zip_path} to {extract_dir}")
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(extract_dir)
-        zip_path.unlink()
         self._temp_print(f"Removed {zip_path}")
         return extract_dir
 
+    def _extract_in_memory(self, data: bytes, filename: str) -> Path:
+        """Extract a small archive from the downloaded body without writing the zip to disk."""
+        extract_dir = self.download_dir / Path(filename).stem
+        self._temp_print(f"Extracting {filename} to {extract_dir}")
+        if self._extract_executor is not None:
+            extracted = self._extract_executor.submit(_extract_zip_bytes_worker, data, extract_dir).result()
+        else:
+            extracted = _extract_zip_bytes_worker(data, extract_dir)
+        if not extracted:
+            self._print(f"Directory {extract_dir} already exists, skipping extraction")
+        return extract_dir
+
+    def _prepare_local_copy(self, target: DownloadTarget) -> Path:
+        """Download a game unless it is already present and extract it if it is a zip."""
+        url, filename, is_zip = target.url, target.filename, target.is_zip
+        file_path = self.download_dir / filename
+        attempt = 0
+        while not file_path.exists():
+            resume_headers = self._resume_headers(filename)
+            archive_data: Optional[bytes] = None
+            try:
+                with self._open_download(url, resume_headers) as response:
+                    length = response.headers.get("Content-Length")
+                    if is_zip and not resume_headers and length and int(length) <= IN_MEMORY_ZIP_LIMIT:
+                        archive_data = response.read()
+                    else:
+                        file_path = self._save_response(response, filename)
+            except urllib.error.HTTPError as exc:
+                if exc.code != 416 or not resume_headers:
+                    raise
+                # Nothing left past the partial: it is either the complete body or no longer matches the file
+                temp_filepath = self.download_dir / f"{filename}.downloading"
+                validator_path = self.download_dir / f"{filename}.downloading.validator"
+                total = exc.headers.get("Content-Range", "").rpartition("/")[2]
+                if total.isdigit() and int(total) == temp_filepath.stat().st_size:
+                    temp_filepath.rename(file_path)
+                    self._cleanup_local(validator_path)
+                    self._temp_print(f"Download completed: {filename}")
+                else:
+                    self._cleanup_local(temp_filepath, validator_path)
+                    self._temp_print(f"Cannot resume {filename}, downloading it again")
+            except (http.client.HTTPException, ConnectionError, TimeoutError) as exc:
+                # A dropped connection continues from the bytes already on disk instead of starting over
+                if attempt >= DOWNLOAD_RETRIES:
+                    raise
+                attempt += 1
+                self._temp_print(f"Download of {filename} failed ({exc}), resuming (attempt {attempt})")
+            if archive_data is not None:
+                # Extract after the connection and its host slot are released; a partial that
+                # could not be resumed (no validator) is left over from an earlier run
+                self._cleanup_local(
+                    self.download_dir / f"{filename}.downloading",
+                    self.download_dir / f"{filename}.downloading.validator",
+                )
+                return self._extract_in_memory(archive_data, filename)
+        if is_zip:
+            return self.extract_zip(file_path)
+        return file_path
+
     def upload_folder(self, folder_path: Path) -> bool:
         if not self.scp_server or not self.scp_path:
             self._print("No SCP server configured, skipping upload")
@@ -305,41 +538,117 @@ class GameDownloader:
         folder_name = folder_path.name
         temp_name = f"{folder_name}.uploading"
 
-        cleanup_cmd = self._build_controlpath_ssh_command()
-        env = os.environ.copy()
-        cleanup_cmd.extend([self.scp_server, f'rm -rf "{self.scp_path}/{temp_name}"'])
-        subprocess.run(cleanup_cmd, check=False, env=env, capture_output=True)
-
-        scp_cmd = self._build_controlpath_ssh_command("scp")
-        scp_cmd.append("-r")
-        scp_cmd.extend([str(folder_path), f"{self.scp_server}:{self.scp_path}/{temp_name}"])
-        subprocess.run(scp_cmd, check=True, env=env)
-
-        ssh_cmd = self._build_controlpath_ssh_command()
-        ssh_cmd.extend([self.scp_server, f'mv "{self.scp_path}/{temp_name}" "{self.scp_path}/{folder_name}"'])
-        subprocess.run(ssh_cmd, check=True, env=env)
+        if self._use_rsync():
+            # rsync leaves whatever arrived in the staging folder, so a retry after a dropped
+            # connection only sends what is missing; --delete drops files from an older attempt
+            rsync_cmd = [
+                "rsync",
+                "-az",
+                "--partial",
+                "--inplace",
+                "--delete",
+                "-e",
+                shlex.join(self._build_controlpath_ssh_command()),
+                f"{folder_path}/",
+                f"{self.scp_server}:{self.scp_path}/{temp_name}/",
+            ]
+            subprocess.run(rsync_cmd, check=True)
+            ssh_cmd = self._build_controlpath_ssh_command()
+            ssh_cmd.extend([self.scp_server, f'cd "{self.scp_path}" && mv "{temp_name}" "{folder_name}"'])
+            subprocess.run(ssh_cmd, check=True)
+        else:
+            self._upload_tar_stream(folder_path, temp_name)
 
+        self._record_upload(folder_path)
         self._print(f"\033[1;32mGame {folder_name} successfully uploaded\033[0m")
         return True
 
-    def build_http_index(self) -> None:
+    def _use_rsync(self) -> bool:
+        """rsync has to be installed locally and on the upload host; the host is asked once per run."""
+        with self._rsync_lock:
+            if self._rsync_available is None:
+                available = shutil.which("rsync") is not None
+                if available:
+                    ssh_cmd = self._build_controlpath_ssh_command()
+                    ssh_cmd.extend([self.scp_server, "command -v rsync >/dev/null"])
+                    available = subprocess.run(ssh_cmd, check=False, capture_output=True).returncode == 0
+                    if not available:
+                        self._print("rsync is not installed on the upload host, falling back to tar over ssh")
+                self._rsync_available = available
+            return self._rsync_available
+
+    def _upload_tar_stream(self, folder_path: Path, temp_name: str) -> None:
+        """Upload without rsync: one tar stream over one ssh call that stages and moves the folder."""
+        folder_name = folder_path.name
+        # The upload only becomes visible once the final mv runs
+        remote_command = (
+            f'cd "{self.scp_path}" && rm -rf "{temp_name}" && mkdir "{temp_name}" '
+            f'&& tar -xf - -C "{temp_name}" && mv "{temp_name}" "{folder_name}"'
+        )
+        ssh_cmd = self._build_controlpath_ssh_command()
+        ssh_cmd.extend([self.scp_server, remote_command])
+        tar_cmd = ["tar", "-cf", "-", "-C", str(folder_path), "."]
+        with subprocess.Popen(tar_cmd, stdout=subprocess.PIPE) as tar_process:
+            ssh_result = subprocess.run(ssh_cmd, stdin=tar_process.stdout, check=False)
+            tar_process.stdout.close()
+        if tar_process.returncode != 0:
+            raise subprocess.CalledProcessError(tar_process.returncode, tar_cmd)
+        if ssh_result.returncode != 0:
+            raise subprocess.CalledProcessError(ssh_result.returncode, ssh_cmd)
+
+    # --- Remote listing ------------------------------------------------
+
+    def use_remote_listing_cache(self, directory: Path, ttl: float) -> None:
+        """Keep the remote tree listing used for index generation on disk between runs."""
         if not self.scp_server or not self.scp_path:
             return
+        key = hashlib.sha1(f"{self.scp_server}:{self.scp_path}".encode("utf-8")).hexdigest()
+        self.remote_listing_cache = directory / f"remote-listing-{key}.json"
+        self.remote_listing_ttl = ttl
 
+    def _load_remote_listing(self) -> Optional[RemoteListing]:
+        path = self.remote_listing_cache
+        if path is None:
+            return None
+        try:
+            if time.time() - path.stat().st_mtime > self.remote_listing_ttl:
+                return None
+            raw = helper_json.loads(path.read_bytes())
+        except (FileNotFoundError, ValueError):
+            return None
+        return RemoteListing(set(raw["directories"]), set(raw["index_dirs"]), dict(raw["files"]))
+
+    def _store_remote_listing(self, listing: RemoteListing) -> None:
+        path = self.remote_listing_cache
+        if path is None:
+            return
+        payload = {
+            "directories": sorted(listing.directories),
+            "index_dirs": sorted(listing.index_dirs),
+            "files": listing.files,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_bytes(helper_json.dumps_pretty(payload))
+        temp_path.replace(path)
+
+    def _fetch_remote_listing(self) -> Optional[RemoteListing]:
         self._temp_print("Getting remote directory listing...")
         ssh_cmd = self._build_controlpath_ssh_command()
-        env = os.environ.copy()
-        find_command = f'cd "{self.scp_path}" && find . -printf "%y %s %p\\n" 2>/dev/null'
+        # GNU find prints type, size and path itself; BSD find has no -printf, so batch stat calls with + there
+        find_command = (
+            f'cd "{self.scp_path}" && if find . -maxdepth 0 -printf "" 2>/dev/null; '
+            'then find . -printf "%y %s %p\\n"; '
+            'else find . \\( -type d -exec stat -f "d %z %N" {} + \\) -o \\( -type f -exec stat -f "f %z %N" {} + \\); '
+            'fi 2>/dev/null'
+        )
         ssh_cmd.extend([self.scp_server, find_command])
-        result = subprocess.run(ssh_cmd, capture_output=True, check=False, env=env, text=True)
+        result = subprocess.run(ssh_cmd, capture_output=True, check=False, text=True)
         if result.returncode != 0:
             self._print(f"Warning: Could not get remote directory listing: {result.stderr}")
-            return
-
-        directories: Set[str] = set()
-        existing_index_dirs: Set[str] = set()
-        files_with_size: List[Tuple[str, int]] = []
+            return None
 
+        listing = RemoteListing()
         for raw_line in result.stdout.strip().splitlines():
             line = raw_line.strip()
             if not line:
@@ -351,173 +660,284 @@ class GameDownloader:
 
             if path_value.startswith("./"):
                 path_value = path_value[2:]
+            elif path_value == ".":
+                path_value = ""
 
-            normalized_path = path_value
-            if normalized_path == ".":
-                normalized_path = ""
-
-            path_parts = [part for part in normalized_path.split("/") if part]
-            if any(part.startswith(".") for part in path_parts):
+            try:
+                size = int(size_str)
+            except ValueError:
                 continue
+            listing.add(entry_type, path_value, size)
+        return listing
+
+    def _record_upload(self, folder_path: Path) -> None:
+        """Remember what an upload added so a cached remote listing can be brought up to date."""
+        if self.remote_listing_cache is None:
+            return  # build_http_index always lists the remote afresh, which already includes the upload
+        listing = RemoteListing()
+        listing.add("d", folder_path.name, 0)
+        for root, dirnames, filenames in os.walk(folder_path):
+            relative_root = Path(root).relative_to(folder_path.parent).as_posix()
+            for name in dirnames:
+                listing.add("d", f"{relative_root}/{name}", 0)
+            for name in filenames:
+                listing.add("f", f"{relative_root}/{name}", os.path.getsize(os.path.join(root, name)))
+        with self._listing_lock:
+            self._uploaded_listings.append(listing)
 
-            if entry_type == "d":
-                directories.add(normalized_path)
-            elif entry_type == "f":
-                try:
-                    size = int(size_str)
-                except ValueError:
-                    continue
-
-                parent_dir = normalized_path.rsplit("/", 1)[0] if "/" in normalized_path else ""
-                filename = normalized_path.rsplit("/", 1)[-1]
-                if filename == "index.json":
-                    existing_index_dirs.add(parent_dir)
-                    continue
-
-                if normalized_path:
-                    files_with_size.append((normalized_path, size))
-
-        directories.add("")  # Ensure root is tracked
+    def build_http_index(self) -> None:
+        if not self.scp_server or not self.scp_path:
+            return
 
-        file_tree: Dict[str, object] = {}
-        for filepath, size in files_with_size:
+        listing = self._load_remote_listing()
+        if listing is None:
+            listing = self._fetch_remote_listing()
+            if listing is None:
+                return
+        else:
+            self._temp_print("Using cached remote directory listing")
+            # A fresh listing already has the uploads; for a cached one they are what changed since
+            for uploaded in self._uploaded_listings:
+                listing.update(uploaded)
+        listing.directories.add("")  # Ensure root is tracked
+
+        # Missing levels are created on first access instead of being probed for every file
+        file_tree = _tree_factory()
+        for filepath, size in listing.files.items():
             parts = filepath.split("/")
             current = file_tree
             for part in parts[:-1]:
-                current = current.setdefault(part, {})  # type: ignore[assignment]
-            current[parts[-1]] = size  # type: ignore[index]
+                current = current[part]
+            current[parts[-1]] = size
 
-        for directory in sorted(dir_name for dir_name in directories if dir_name):
+        for directory in sorted(dir_name for dir_name in listing.directories if dir_name):
             current = file_tree
             for part in directory.split("/"):
-                current = current.setdefault(part, {})  # type: ignore[assignment]
+                current = current[part]
 
-        dirs_to_update = {directory for directory in directories if directory not in existing_index_dirs}
+        dirs_to_update = listing.directories - listing.index_dirs
 
         if not dirs_to_update:
+            self._store_remote_listing(listing)
             self._print("All index.json files already present")
             return
 
-        self._generate_index_files(file_tree, self.scp_path, dirs_to_update)
+        indexes: Dict[str, bytes] = {}
+        self._generate_index_files(file_tree, dirs_to_update, indexes)
+        self._upload_index_files(indexes)
+        listing.index_dirs.update(indexes)
+        self._store_remote_listing(listing)
         self._temp_print("HTTP index built successfully")
 
     def _generate_index_files(
         self,
         tree: Dict[str, object],
-        remote_path: str,
         dirs_to_update: Set[str],
+        indexes: Dict[str, bytes],
         current_path: str = "",
     ) -> None:
-        remote_index_path = f"{remote_path}/{current_path}/index.json" if current_path else f"{remote_path}/index.json"
+        """Collect the index.json contents for every directory in dirs_to_update, keyed by directory."""
         if current_path in dirs_to_update:
             simplified_tree = {key: {} if isinstance(value, dict) else value for key, value in tree.items()}
-            temp_index_file = self.download_dir / "temp_index.json"
-            with open(temp_index_file, "w", encoding="utf-8") as handle:
-                json.dump(simplified_tree, handle, indent=2, ensure_ascii=False)
-            scp_cmd = self._build_controlpath_ssh_command("scp")
-            env = os.environ.copy()
-            scp_cmd.extend([str(temp_index_file), f"{self.scp_server}:{remote_index_path}"])
-            subprocess.run(scp_cmd, check=True, env=env)
-            temp_index_file.unlink()
-            printable_path = current_path or "."
-            self._print(f"Created index.json in {printable_path}")
+            indexes[current_path] = helper_json.dumps_pretty(simplified_tree)
             dirs_to_update.discard(current_path)
 
         for key, value in tree.items():
+            if not dirs_to_update:
+                # Every missing index has been written; the rest of the tree needs no walking
+                return
             if isinstance(value, dict):
                 subdir_path = f"{current_path}/{key}" if current_path else key
-                self._generate_index_files(value, remote_path, dirs_to_update, subdir_path)
+                self._generate_index_files(value, dirs_to_update, indexes, subdir_path)
+
+    def _upload_index_files(self, indexes: Dict[str, bytes]) -> None:
+        """Send all generated index.json files to the remote in a single tar stream."""
+        archive = io.BytesIO()
+        modified = int(time.time())
+        with tarfile.open(fileobj=archive, mode="w") as tar:
+            for directory, payload in indexes.items():
+                info = tarfile.TarInfo(f"{directory}/index.json" if directory else "index.json")
+                info.size = len(payload)
+                info.mode = 0o644
+                info.mtime = modified
+                tar.addfile(info, io.BytesIO(payload))
+
+        ssh_cmd = self._build_controlpath_ssh_command()
+        ssh_cmd.extend([self.scp_server, f'tar -xf - -C "{self.scp_path}"'])
+        subprocess.run(ssh_cmd, input=archive.getvalue(), check=True)
+        for directory in indexes:
+            self._print(f"Created index.json in {directory or '.'}")
+
+    @staticmethod
+    def _cleanup_local(*paths: Path) -> bool:
+        """Remove local files or folders with one lstat each; returns True if anything was removed."""
+        removed = False
+        for path in paths:
+            try:
+                mode = os.lstat(path).st_mode
+            except FileNotFoundError:
+                continue
+            if stat.S_ISDIR(mode):
+                shutil.rmtree(path)
+            else:
+                os.unlink(path)
+            removed = True
+        return removed
+
+    def _upload_existing_folder(self, local_folder_path: Path) -> bool:
+        """Upload a folder left over from an earlier run and remove the local copy; runs on the upload pool."""
+        try:
+            return self.upload_folder(local_folder_path)
+        finally:
+            self._cleanup_local(local_folder_path)
+
+    def _transfer_game(self, pending_download: Optional["Future[Path]"], target: DownloadTarget) -> bool:
+        """Finish the local copy of a game and upload it if it is a zip; runs on the upload pool."""
+        if pending_download is not None:
+            local_path = pending_download.result()
+        else:
+            local_path = self._prepare_local_copy(target)
+        if not target.is_zip:
+            return False
+        return self.upload_folder(local_path)
+
+    def _check_downloadable(self, targets: Sequence[str], remote_folders: Set[str]) -> None:
+        """Fail before any transfer starts if a game is neither on the remote nor downloadable."""
+        for relative_path in targets:
+            entry = self.catalog.get(relative_path)
+            if not entry or relative_path in remote_folders:
+                continue
+            if not self._download_target(relative_path, entry).is_scummvm_download:
+                raise FileNotFoundError(f"Game {relative_path} missing on remote and lacks ScummVM download URL")
+
+    def _start_downloads(
+        self,
+        executor: ThreadPoolExecutor,
+        targets: Sequence[str],
+        remote_folders: Set[str],
+        max_transfers: Optional[int],
+    ) -> Dict[str, "Future[Path]"]:
+        """Submit download and extraction for every target the processing loop is going to transfer."""
+        downloads: Dict[str, "Future[Path]"] = {}
+        transfer_candidates = 0
+        for relative_path in targets:
+            if relative_path in remote_folders:
+                continue
+            entry = self.catalog.get(relative_path)
+            if not entry:
+                continue
+            target = self._download_target(relative_path, entry)
+            if not target.is_scummvm_download:
+                continue
+
+            # Mirror the transfer budget of the processing loop so we never fetch more than it uploads
+            if self.scp_server and self.scp_path and max_transfers is not None and transfer_candidates >= max_transfers:
+                break
+            transfer_candidates += 1
+
+            if target.is_zip and (self.download_dir / relative_path).exists():
+                continue
+            downloads[relative_path] = executor.submit(self._prepare_local_copy, target)
+        return downloads
 
     # --- Processing ------------------------------------------------------
 
-    def download_and_process_games(self, requested_ids: Sequence[str], max_transfers: Optional[int] = None) -> None:
+    def download_and_process_games(self, requested_ids: Iterable[str], max_transfers: Optional[int] = None) -> None:
+        # Only the command-line selection is materialized; without one the targets come straight from the catalog
+        requested_ids = list(requested_ids)
         targets = self.resolve_requested_targets(requested_ids)
-        self.processed_games_metadata = []
+        self.processed_games_metadata = {}
 
         try:
-            remote_folders_snapshot = self.get_remote_folders()
-            self._print(f"Found {len(remote_folders_snapshot)} folders on remote server")
+            if requested_ids:
+                # Only the requested games matter, so check just those instead of listing everything
+                remote_folders_snapshot = self.get_existing_remote_folders(targets)
+                self._print(f"Found {len(remote_folders_snapshot)} of {len(targets)} requested folders on remote server")
+            else:
+                remote_folders_snapshot = self.get_remote_folders()
+                self._print(f"Found {len(remote_folders_snapshot)} folders on remote server")
         except RuntimeError as exc:
             self._print(f"Error getting remote folders: {exc}")
             return
 
-        remote_folders_remaining = set(remote_folders_snapshot)
         remote_folders_for_validation = set(remote_folders_snapshot)
+        self._check_downloadable(targets, remote_folders_snapshot)
 
-        transfer_count = 0
-        for relative_path in targets:
-            entry = self.catalog.get(relative_path)
-            if not entry:
-                self._print(f"Warning: {relative_path} missing from catalog, skipping")
-                continue
+        download_executor = ThreadPoolExecutor(max_workers=self.download_workers)
+        upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS)
+        # spawn rather than fork: the download threads are already running when workers start
+        self._extract_executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+        interrupted = False
+        try:
+            downloads = self._start_downloads(download_executor, targets, remote_folders_snapshot, max_transfers)
+            uploads: Dict[str, "Future[bool]"] = {}
+
+            transfer_count = 0
+            for relative_path in targets:
+                entry = self.catalog.get(relative_path)
+                if not entry:
+                    self._print(f"Warning: {relative_path} missing from catalog, skipping")
+                    continue
 
-            download_url = self._select_download_url(entry)
-            normalized_url = download_url or ""
-            has_scummvm_download = normalized_url.startswith("https://downloads.scummvm.org/frs/")
-            filename = normalized_url.rsplit("/", 1)[-1] if normalized_url else relative_path
+                target = self._download_target(relative_path, entry)
 
-            exists_on_remote = self.folder_exists_on_remote(relative_path, remote_folders_remaining)
-            should_process_metadata = False
-            if exists_on_remote:
-                self._print(f"\033[92mGame {relative_path} already exists on remote server, skipping\033[0m")
-                should_process_metadata = True
-            else:
-                if not has_scummvm_download:
-                    raise FileNotFoundError(f"Game {relative_path} missing on remote and lacks ScummVM download URL")
-
-                local_folder_path = self.download_dir / relative_path
-                local_zip_path = self.download_dir / filename if filename.endswith(".zip") else None
-                allow_transfers = max_transfers is None or transfer_count < max_transfers
-
-                if filename.endswith(".zip") and local_folder_path.exists():
-                    upload_succeeded = False
-                    if allow_transfers and self.upload_folder(local_folder_path):
-                        transfer_count += 1
-                        upload_succeeded = True
+                exists_on_remote = self.folder_exists_on_remote(relative_path, remote_folders_snapshot)
+                should_process_metadata = False
+                if exists_on_remote:
+                    self._print(f"\033[92mGame {relative_path} already exists on remote server, skipping\033[0m")
                     should_process_metadata = True
-                    if local_folder_path.exists():
-                        if local_folder_path.is_dir():
-                            shutil.rmtree(local_folder_path)
-                        else:
-                            local_folder_path.unlink()
-                    if upload_succeeded:
-                        remote_folders_for_validation.add(relative_path)
                 else:
-                    file_path = self.download_dir / filename
-                    temp_file_path = self.download_dir / f"{filename}.downloading"
-                    if temp_file_path.exists():
-                        temp_file_path.unlink()
-                        self._print(f"Cleaned up stale temp download: {temp_file_path}")
-
-                    if allow_transfers:
-                        if not file_path.exists():
-                            downloaded_file = self.download_file(normalized_url, filename)
+                    local_folder_path = self.download_dir / relative_path
+                    file_path = self.download_dir / target.filename
+                    allow_transfers = max_transfers is None or transfer_count < max_transfers
+                    pending_download = downloads.pop(relative_path, None)
+
+                    if pending_download is None and target.is_zip and local_folder_path.exists():
+                        if allow_transfers and self.scp_server and self.scp_path:
+                            transfer_count += 1
+                            uploads[relative_path] = upload_executor.submit(self._upload_existing_folder, local_folder_path)
                         else:
-                            downloaded_file = file_path
-
-                        if filename.endswith(".zip"):
-                            extracted_folder = self.extract_zip(downloaded_file)
-                            if self.upload_folder(extracted_folder):
-                                transfer_count += 1
-                                remote_folders_for_validation.add(relative_path)
+                            self._cleanup_local(local_folder_path)
                         should_process_metadata = True
                     else:
-                        if file_path.exists():
-                            file_path.unlink()
-                        if local_folder_path.exists():
-                            if local_folder_path.is_dir():
-                                shutil.rmtree(local_folder_path)
-                            else:
-                                local_folder_path.unlink()
-                        if local_zip_path and local_zip_path.exists():
-                            local_zip_path.unlink()
-
-            if should_process_metadata:
-                merged_entry = self.merged_metadata_by_path.get(relative_path)
-                if merged_entry:
-                    self.processed_games_metadata.append(merged_entry)
-                else:
-                    self._print(f"Warning: No metadata found for {relative_path}")
+                        # A .downloading file from an interrupted run is kept; the download resumes from it
+                        if allow_transfers:
+                            # upload_folder either succeeds or raises, so the budget can be counted at submission
+                            if target.is_zip and self.scp_server and self.scp_path:
+                                transfer_count += 1
+                            uploads[relative_path] = upload_executor.submit(self._transfer_game, pending_download, target)
+                            should_process_metadata = True
+                        else:
+                            if pending_download is not None and not pending_download.cancel():
+                                wait([pending_download])
+                            self._cleanup_local(file_path, local_folder_path)
+
+                if should_process_metadata:
+                    merged_entry = self.merged_metadata_by_path.get(relative_path)
+                    if merged_entry:
+                        self.processed_games_metadata[relative_path] = merged_entry
+                    else:
+                        self._print(f"Warning: No metadata found for {relative_path}")
+
+            # Results are collected on this thread, so the validation set needs no lock
+            for relative_path, upload in uploads.items():
+                if upload.result():
+                    remote_folders_for_validation.add(relative_path)
+        except KeyboardInterrupt:
+            # Ctrl-C also reaches the rsync/ssh and extraction children; stop the download threads too
+            interrupted = True
+            self._cancel_downloads.set()
+            raise
+        finally:
+            # Running uploads still use the extraction pool, so let them finish before closing it,
+            # unless the user asked to stop
+            upload_executor.shutdown(wait=not interrupted, cancel_futures=True)
+            download_executor.shutdown(wait=False, cancel_futures=True)
+            self._extract_executor.shutdown(wait=False, cancel_futures=True)
+            self._extract_executor = None
+            self._http.close()
+            for host, peak in sorted(self._http.peak_in_flight.items()):
+                self._print(f"Peak concurrent downloads from {host}: {peak} (limit {self._http.max_per_host})")
 
         if not requested_ids and self.scp_server and self.scp_path:
             errors, warnings = validate_remote_folders(remote_folders_for_validation, self.catalog)
@@ -559,36 +979,39 @@ Environment Variables:
     parser.add_argument('--scp-path', help='Remote path for uploading games')
     parser.add_argument('--scp-port', type=int, help='SSH/SCP port (default: 22)')
     parser.add_argument('--max-transfers', type=int, help='Maximum number of games to transfer (excluding skipped ones)')
+    parser.add_argument('--download-workers', type=int, default=DOWNLOAD_WORKERS, help=f'Number of concurrent downloads (default: {DOWNLOAD_WORKERS})')
+    parser.add_argument('--per-host', type=int, default=DOWNLOAD_PER_HOST, help=f'Maximum concurrent downloads from one host (default: {DOWNLOAD_PER_HOST})')
+    parser.add_argument('--remote-listing-ttl', type=float, default=REMOTE_LISTING_TTL, help=f'Seconds to reuse the cached remote tree listing for the HTTP index (default: {REMOTE_LISTING_TTL})')
+    add_sheet_cache_arguments(parser)
     
     args = parser.parse_args()
     
     # Filter out testbed and playground3d
-    game_ids = [g for g in args.games if g not in ['testbed', 'playground3d']]
+    game_ids = (g for g in args.games if g not in EXCLUDED_GAME_IDS)
     
     # Fallback to environment variables if CLI args are not provided
     scp_server = args.scp_server or (os.environ.get('SSH_USER') + '@' + os.environ.get('SSH_HOST') if os.environ.get('SSH_USER') and os.environ.get('SSH_HOST') else None)
     scp_path = args.scp_path or os.environ.get('SSH_PATH')
     scp_port = args.scp_port or (int(os.environ.get('SSH_PORT')) if os.environ.get('SSH_PORT') else None)
-    downloader = GameDownloader(download_dir=args.download_dir, scp_server=scp_server, scp_path=scp_path, scp_port=scp_port)
-
-    connection_opened = False
-    if scp_server and scp_path:
-        downloader.open_connection()
-        connection_opened = True
+    downloader = GameDownloader(
+        download_dir=args.download_dir,
+        scp_server=scp_server,
+        scp_path=scp_path,
+        scp_port=scp_port,
+        download_workers=args.download_workers,
+        per_host=args.per_host,
+    )
+    if not args.no_cache:
+        downloader.use_remote_listing_cache(DEFAULT_CACHE_DIR, 0 if args.refresh_cache else args.remote_listing_ttl)
 
     try:
-        metadata_path = Path(__file__).parent.parent / "assets" / "metadata.json"
-        downloader.refresh_catalog(metadata_path)
-        downloader.download_and_process_games(game_ids, args.max_transfers)
+        with downloader.ssh_session():
+            metadata_path = Path(__file__).parent.parent / "assets" / "metadata.json"
+            downloader.refresh_catalog(metadata_path, sheet_cache_from_args(args))
+            downloader.download_and_process_games(game_ids, args.max_transfers)
     except KeyboardInterrupt:
         print("\nInterrupted by user")
         sys.exit(1)
-    finally:
-        if connection_opened:
-            try:
-                downloader.close_connection()
-            except RuntimeError:
-                pass
 
 
 if __name__ == "__main__":
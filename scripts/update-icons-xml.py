@@ -2,7 +2,6 @@
 """Update scummvm-icons XML files using metadata overrides."""
 
 import argparse
-import json
 import re
 import sys
 from collections import OrderedDict
@@ -11,6 +10,8 @@ from typing import Dict, Optional, Tuple
 import xml.dom.minidom
 import xml.etree.ElementTree as ET
 
+import helper_json
+
 METADATA_PATH = Path(__file__).parent.parent / "assets" / "metadata.json"
 GAMES_XML_PATH = Path(__file__).parent.parent / "scummvm-icons" / "games.xml"
 COMPANIES_XML_PATH = Path(__file__).parent.parent / "scummvm-icons" / "companies.xml"
@@ -35,8 +36,7 @@ GAME_ATTR_ORDER = (
 def load_metadata(metadata_path: Path) -> Dict[str, Dict[str, object]]:
     if not metadata_path.exists():
         return {}
-    with open(metadata_path, "r", encoding="utf-8") as handle:
-        raw = json.load(handle)
+    raw = helper_json.loads(metadata_path.read_bytes())
     result: Dict[str, Dict[str, object]] = {}
     for relative_path, entry in raw.items():
         if not isinstance(entry, dict):